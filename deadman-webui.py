@@ -5,16 +5,29 @@ Real-time monitoring with 1-second updates for large-scale host monitoring
 """
 
 import argparse
+import base64
+import gzip
+import json
+import mmap
 import os
+import queue
 import sys
+import threading
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from collections import deque
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 import flask
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, Response, render_template_string, jsonify, request
+
+try:
+    import orjson  # Optional, faster encoding of API responses
+except ImportError:
+    orjson = None
 
 
 class DeadmanConfig:
@@ -31,14 +44,11 @@ class DeadmanConfig:
         try:
             with open(self.config_path, 'r') as f:
                 for line in f:
-                    line = line.strip()
-                    if line and '\t' in line:
-                        parts = line.split('\t')
-                        if len(parts) >= 2:
-                            name = parts[0]
-                            host = parts[1]
-                            self.targets[name] = host
-                            self.target_order.append(name)
+                    name, tab, rest = line.strip().partition('\t')
+                    if tab:
+                        host = rest.partition('\t')[0]
+                        self.targets[name] = host
+                        self.target_order.append(name)
         except FileNotFoundError:
             print(f"Warning: Config file {self.config_path} not found")
         except Exception as e:
@@ -48,19 +58,37 @@ class DeadmanConfig:
 class HostMonitor:
     """Monitor class for tracking host statistics and history"""
     
+    HISTORY_SIZE = 600  # Store up to 600 seconds of data
+    SEQUENCE_MIN = -2 ** 63  # Range of the int64 sequence column
+    SEQUENCE_MAX = 2 ** 63 - 1
+    
     def __init__(self, name: str, address: str):
         self.name = name
         self.address = address
-        self.history = deque(maxlen=600)  # Store up to 600 seconds of data
+        # History ring buffer stored as parallel arrays, one slot per measurement
+        self._timestamp = array('d', [0.0]) * self.HISTORY_SIZE  # Epoch seconds
+        self._current = array('d', [0.0]) * self.HISTORY_SIZE
+        self._average = array('d', [0.0]) * self.HISTORY_SIZE
+        self._sequence = array('q', [0]) * self.HISTORY_SIZE
+        self._loss = bytearray(self.HISTORY_SIZE)
+        self._head = 0  # Next slot to write
+        self._count = 0  # Number of valid slots
+        self._loss_count = 0  # Number of loss entries currently in history
+        self._sparkline_cache = {}  # Effective count -> encoded sparkline
         self.last_current = 0.0
         self.last_average = 0.0
         self.last_sequence = 0
         self.last_update = None
+        self._status = 'unknown'  # Status as of the last measurement, before staleness
         self.prev_current = None
         self.prev_average = None
         
-    def add_measurement(self, current: float, average: float, sequence: int, timestamp: datetime):
-        """Add a new measurement"""
+    def add_measurement(self, current: float, average: float, sequence: int, timestamp: float):
+        """Add a new measurement taken at the given epoch timestamp"""
+        # Ignore measurements that are not newer than the last one already recorded
+        if self.last_update is not None and timestamp <= self.last_update:
+            return
+        
         # Check for loss: RTT is 0 OR both current and average are exactly the same as previous values
         is_loss = (current == 0) or (
             self.prev_current is not None and 
@@ -70,13 +98,21 @@ class HostMonitor:
             current > 0  # Only apply this rule when RTT values are non-zero
         )
         
-        self.history.append({
-            'timestamp': timestamp,
-            'current': current,
-            'average': average,
-            'sequence': sequence,
-            'is_loss': is_loss
-        })
+        # Write every column before touching the counters, so that a value that
+        # does not fit its column leaves the ring unchanged
+        head = self._head
+        dropped_loss = self._loss[head] if self._count == self.HISTORY_SIZE else 0
+        self._sequence[head] = sequence
+        self._timestamp[head] = timestamp
+        self._current[head] = current
+        self._average[head] = average
+        self._loss[head] = is_loss
+        
+        if self._count < self.HISTORY_SIZE:
+            self._count += 1
+        self._loss_count += is_loss - dropped_loss
+        self._head = (head + 1) % self.HISTORY_SIZE
+        self._sparkline_cache.clear()
         
         # Update previous values for next comparison
         self.prev_current = current
@@ -86,50 +122,231 @@ class HostMonitor:
         self.last_average = average
         self.last_sequence = sequence
         self.last_update = timestamp
+        self._status = 'up' if self.is_online() else 'down'
     
     def get_loss_rate(self) -> float:
         """Calculate loss rate from recent history"""
-        if not self.history:
+        if not self._count:
             return 0.0
         
-        total_measurements = len(self.history)
-        lost_measurements = sum(1 for h in self.history if h['is_loss'])
-        return (lost_measurements / total_measurements) * 100.0
+        return (self._loss_count / self._count) * 100.0
+    
+    def _ring_slice(self, column, count: int):
+        """Get the newest count values of a history column, oldest first"""
+        start = self._head - count
+        if start >= 0:
+            return column[start:self._head]
+        # Wrapped around: tail of the buffer followed by its head
+        return column[start:] + column[:self._head]
     
     def get_sparkline_data(self, time_range: int = 180) -> List[Dict]:
         """Get data for sparkline chart for specified time range"""
-        if time_range >= len(self.history):
-            return list(self.history)
-        return list(self.history)[-time_range:]
+        count = min(time_range, self._count)
+        columns = (self._timestamp, self._current, self._average, self._sequence, self._loss)
+        
+        return [
+            {
+                'timestamp': timestamp,
+                'current': current,
+                'average': average,
+                'sequence': sequence,
+                'is_loss': bool(is_loss)
+            }
+            for timestamp, current, average, sequence, is_loss
+            in zip(*(self._ring_slice(column, count) for column in columns))
+        ]
+    
+    def count_measurements_since(self, since: Optional[float], limit: int = HISTORY_SIZE) -> int:
+        """Count measurements newer than the given epoch timestamp, up to limit"""
+        count = 0
+        while count < min(limit, self._count):
+            i = (self._head - count - 1) % self.HISTORY_SIZE
+            if since is not None and self._timestamp[i] <= since:
+                break
+            count += 1
+        return count
+    
+    def _encode_sparkline(self, count: int) -> Dict:
+        """Encode the newest count measurements for drawing, oldest first
+        
+        'sl' holds one byte per bar (RTT capped at 100ms) and 'lm' a bitmask of
+        lost measurements, least significant bit first, both base64-encoded.
+        'ts' is the epoch timestamp of the newest encoded measurement.
+        """
+        heights = bytes(min(100, max(0, int(current + 0.5)))
+                        for current in self._ring_slice(self._current, count))
+        loss_mask = bytearray((count + 7) // 8)
+        for n, is_loss in enumerate(self._ring_slice(self._loss, count)):
+            if is_loss:
+                loss_mask[n >> 3] |= 1 << (n & 7)
+        
+        return {
+            'sl': base64.b64encode(heights).decode('ascii'),
+            'lm': base64.b64encode(loss_mask).decode('ascii'),
+            'ts': self._timestamp[self._head - 1] if count else None
+        }
+    
+    def get_sparkline(self, time_range: int = 180) -> Dict:
+        """Get encoded sparkline for specified time range, cached until the next measurement"""
+        # Keyed by the clamped count so arbitrary time ranges share entries
+        count = max(0, min(time_range, self._count))
+        sparkline = self._sparkline_cache.get(count)
+        if sparkline is None:
+            sparkline = self._encode_sparkline(count)
+            self._sparkline_cache[count] = sparkline
+        return sparkline
+    
+    def get_sparkline_since(self, since: Optional[float], limit: int = HISTORY_SIZE) -> Dict:
+        """Get encoded sparkline of at most limit measurements newer than the given epoch timestamp"""
+        count = self.count_measurements_since(since, limit)
+        sparkline = self._encode_sparkline(count)
+        # Per-measurement timestamps let clients skip measurements they already have
+        sparkline['timestamps'] = self._ring_slice(self._timestamp, count).tolist()
+        return sparkline
     
     def is_online(self) -> bool:
         """Check if host is currently online"""
         return self.last_current > 0
     
-    def get_status_class(self) -> str:
-        """Get CSS class for status"""
-        if not self.last_update:
+    def get_status_class(self, now: Optional[float] = None) -> str:
+        """Get CSS class for status, optionally as of a given epoch time"""
+        if self.last_update is None:
             return 'unknown'
         
         # Consider host down if no update in last 5 seconds
-        if datetime.now() - self.last_update > timedelta(seconds=5):
+        if (now if now is not None else time.time()) - self.last_update > 5:
             return 'stale'
         
-        return 'up' if self.is_online() else 'down'
+        return self._status
 
 
 class LogParser:
     """Enhanced parser for deadman log files with history tracking"""
     
+    MAX_OPEN_LOGS = 512  # Log file descriptors kept open between updates
+    
     def __init__(self, log_dir: str):
         self.log_dir = Path(log_dir)
         self.monitors = {}  # host_name -> HostMonitor
+        self._offsets: Dict[str, Tuple[int, int]] = {}  # log_name -> (inode, byte offset)
+        self._fds: Dict[str, Tuple[int, int]] = {}  # log_name -> (inode, open file descriptor)
+        self._logs_cache: Optional[Tuple[int, List[str]]] = None  # (directory mtime, log names)
+        self.lock = threading.RLock()  # Serializes updates against readers of monitor state
+        # Log files are read concurrently, file I/O releases the GIL
+        self._pool = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
         
     def get_available_logs(self) -> List[str]:
         """Get list of available log files"""
-        if not self.log_dir.exists():
+        try:
+            mtime = os.stat(self.log_dir).st_mtime_ns
+        except OSError:
             return []
-        return [f.name for f in self.log_dir.iterdir() if f.is_file()]
+        
+        # Directory mtime changes whenever a file is added, removed or renamed
+        if self._logs_cache is None or self._logs_cache[0] != mtime:
+            with os.scandir(self.log_dir) as it:
+                self._logs_cache = (mtime, [entry.name for entry in it if entry.is_file()])
+        return self._logs_cache[1]
+    
+    def _parse_timestamp(self, timestamp_str: str) -> float:
+        """Convert a local "YYYY-MM-DD HH:MM:SS" timestamp to epoch seconds"""
+        return datetime.fromisoformat(timestamp_str).timestamp()
+    
+    def _parse_lines(self, lines: List[str]) -> List[Tuple[float, float, int, float]]:
+        """Parse deadman log lines into add_measurement arguments, skipping malformed lines"""
+        entries = []
+        for line in lines:
+            parts = line.split()
+            try:
+                timestamp = self._parse_timestamp(f"{parts[0]} {parts[1]}")
+                current_value = float(parts[2])
+                average_value = float(parts[3])
+                count = int(parts[4])
+            except (ValueError, IndexError):
+                continue
+            if not HostMonitor.SEQUENCE_MIN <= count <= HostMonitor.SEQUENCE_MAX:
+                continue
+            
+            entries.append((current_value, average_value, count, timestamp))
+        return entries
+    
+    def _parse_columns(self, lines: List[str]) -> List[Tuple[float, float, int, float]]:
+        """Parse a block of log lines column by column into add_measurement arguments"""
+        fields = ' '.join(lines).split()
+        try:
+            if len(fields) != 5 * len(lines):
+                raise ValueError('irregular field count')
+            # Any line with a missing or extra field shifts a date into a numeric column,
+            # which makes the conversion below fail
+            counts = list(map(int, fields[4::5]))
+            if counts and (min(counts) < HostMonitor.SEQUENCE_MIN or max(counts) > HostMonitor.SEQUENCE_MAX):
+                raise ValueError('count out of range')
+            return list(zip(
+                map(float, fields[2::5]),
+                map(float, fields[3::5]),
+                counts,
+                map(self._parse_timestamp, map(' '.join, zip(fields[0::5], fields[1::5])))
+            ))
+        except ValueError:
+            # Parse line by line, skipping malformed lines
+            return self._parse_lines(lines)
+    
+    def _log_fd(self, log_name: str, log_path: Path, inode: int) -> Tuple[int, bool]:
+        """Get a file descriptor for a log and whether it is kept open for later updates"""
+        cached = self._fds.get(log_name)
+        if cached is not None:
+            if cached[0] == inode:
+                return cached[1], True
+            # Log was rotated, the descriptor still refers to the old file
+            del self._fds[log_name]
+            os.close(cached[1])
+        
+        fd = os.open(log_path, os.O_RDONLY)
+        if len(self._fds) < self.MAX_OPEN_LOGS:
+            self._fds[log_name] = (inode, fd)
+            return fd, True
+        return fd, False
+    
+    def _close_missing_logs(self, available_logs: List[str]):
+        """Close descriptors of logs that are no longer in the log directory"""
+        for log_name in self._fds.keys() - set(available_logs):
+            os.close(self._fds.pop(log_name)[1])
+    
+    def _read_lines(self, log_name: str, log_path: Path, stat: os.stat_result,
+                    offset: int) -> Tuple[List[str], int]:
+        """Read complete lines appended after offset, returning them with the new offset"""
+        # A single pread on a descriptor kept open across updates, instead of
+        # open, seek, read and close on every update
+        fd, keep_open = self._log_fd(log_name, log_path, stat.st_ino)
+        try:
+            data = os.pread(fd, stat.st_size - offset, offset)
+        finally:
+            if not keep_open:
+                os.close(fd)
+        
+        # Leave a partially written last line for the next read
+        end = data.rfind(b'\n') + 1
+        lines = data[:end].decode('utf-8', errors='replace').splitlines()
+        return lines, offset + end
+    
+    def _read_tail(self, log_path: Path, tail_lines: int) -> Tuple[List[str], int]:
+        """Read the last complete lines of a log file, returning them with the end offset"""
+        with open(log_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return [], 0
+            
+            # Scan backward for newlines so the discarded prefix is never copied
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Leave a partially written last line for the next read
+                end = mm.rfind(b'\n') + 1
+                pos = end - 1
+                for _ in range(tail_lines):
+                    if pos < 0:
+                        break
+                    pos = mm.rfind(b'\n', 0, pos)
+                data = mm[pos + 1:end] if end else b''
+        
+        return data.decode('utf-8', errors='replace').splitlines(), end
     
     def parse_log_file(self, log_name: str, tail_lines: int = 100) -> List[Dict]:
         """Parse a specific log file and return recent entries"""
@@ -137,41 +354,22 @@ class LogParser:
         if not log_path.exists():
             return []
         
-        entries = []
         try:
-            with open(log_path, 'r') as f:
-                lines = f.readlines()
-                # Get the last N lines
-                recent_lines = lines[-tail_lines:] if len(lines) > tail_lines else lines
-                
-                for line in recent_lines:
-                    line = line.strip()
-                    if line:
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            timestamp_str = f"{parts[0]} {parts[1]}"
-                            try:
-                                timestamp = datetime.fromisoformat(timestamp_str)
-                                current_value = float(parts[2])
-                                average_value = float(parts[3])
-                                count = int(parts[4])
-                                
-                                entries.append({
-                                    'timestamp': timestamp,
-                                    'current': current_value,
-                                    'average': average_value,
-                                    'count': count,
-                                    'is_loss': current_value == 0
-                                })
-                            except (ValueError, IndexError):
-                                continue
+            lines, _ = self._read_tail(log_path, tail_lines)
         except Exception as e:
             print(f"Error parsing log file {log_name}: {e}")
+            return []
         
-        return entries
+        return [{
+            'timestamp': timestamp,
+            'current': current,
+            'average': average,
+            'count': count,
+            'is_loss': current == 0
+        } for current, average, count, timestamp in self._parse_lines(lines)]
     
     def update_monitor(self, log_name: str, address: str = None):
-        """Update monitor with latest data from log file"""
+        """Update monitor with data appended to the log file since the last update"""
         if log_name not in self.monitors:
             self.monitors[log_name] = HostMonitor(log_name, address or 'unknown')
         
@@ -179,17 +377,32 @@ class LogParser:
         if address:
             monitor.address = address
         
-        # Get recent entries and update monitor
-        entries = self.parse_log_file(log_name, tail_lines=600)  # Last 600 entries
+        log_path = self.log_dir / log_name
+        try:
+            stat = os.stat(log_path)
+            if log_name not in self._offsets:
+                # First sight of this log: backfill the last 600 entries only
+                lines, offset = self._read_tail(log_path, HostMonitor.HISTORY_SIZE)
+                measurements = self._parse_columns(lines)
+            else:
+                inode, offset = self._offsets[log_name]
+                if inode != stat.st_ino or stat.st_size < offset:
+                    # Log was rotated or truncated, start over from the beginning
+                    offset = 0
+                if stat.st_size == offset:
+                    lines = []
+                else:
+                    lines, offset = self._read_lines(log_name, log_path, stat, offset)
+                measurements = self._parse_lines(lines)
+        except Exception as e:
+            print(f"Error parsing log file {log_name}: {e}")
+            return
+        
+        self._offsets[log_name] = (stat.st_ino, offset)
         
         # Add new entries to monitor
-        for entry in entries:
-            monitor.add_measurement(
-                entry['current'],
-                entry['average'],
-                entry['count'],
-                entry['timestamp']
-            )
+        for current, average, count, timestamp in measurements:
+            monitor.add_measurement(current, average, count, timestamp)
     
     def get_all_monitors(self) -> Dict[str, HostMonitor]:
         """Get all monitors"""
@@ -199,9 +412,19 @@ class LogParser:
         """Update all monitors with latest data"""
         available_logs = self.get_available_logs()
         
-        for log_name in available_logs:
-            address = config_targets.get(log_name, 'unknown')
-            self.update_monitor(log_name, address)
+        with self.lock:
+            self._close_missing_logs(available_logs)
+            list(self._pool.map(
+                lambda log_name: self.update_monitor(log_name, config_targets.get(log_name, 'unknown')),
+                available_logs
+            ))
+
+
+def encode_json(obj) -> bytes:
+    """Encode an API payload of plain values as compact JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
 
 
 # Flask app setup
@@ -210,7 +433,16 @@ app = Flask(__name__)
 # Global variables
 config = None
 log_parser = None
+monitor_stream = None
 app_title = "Deadman Monitoring"
+index_html = None  # Dashboard page, rendered on first request
+
+# Encoded /api/monitors responses shared by all clients,
+# time_range -> (monotonic time, payload, gzip-compressed payload or None)
+SNAPSHOT_TTL = 1.0  # seconds
+GZIP_MIN_SIZE = 512  # bytes, smaller responses are not worth compressing
+snapshot_cache = {}
+snapshot_lock = None
 
 # HTML template for table-based monitoring
 HTML_TEMPLATE = '''
@@ -481,6 +713,11 @@ HTML_TEMPLATE = '''
         let refreshInterval = 1000; // 1 second default
         let refreshTimer = null;
         let timeRange = 180; // 3 minutes default
+        let eventSource = null;
+        let hosts = []; // Host rows in display order
+        let hostIndex = {}; // host name -> host row
+        let dirty = false; // Host rows changed since last render
+        let tableLayout = ''; // Host names and time range the table rows were built for
 
         function updateRefreshInterval() {
             refreshInterval = parseInt(document.getElementById('refreshInterval').value);
@@ -519,7 +756,13 @@ HTML_TEMPLATE = '''
 
         function startAutoRefresh() {
             stopAutoRefresh();
-            refreshTimer = setInterval(refreshData, refreshInterval);
+            if (window.EventSource) {
+                // Server pushes updates, only re-render at the chosen interval
+                connectStream();
+                refreshTimer = setInterval(render, refreshInterval);
+            } else {
+                refreshTimer = setInterval(pollUpdates, refreshInterval);
+            }
         }
 
         function stopAutoRefresh() {
@@ -527,16 +770,138 @@ HTML_TEMPLATE = '''
                 clearInterval(refreshTimer);
                 refreshTimer = null;
             }
+            if (eventSource) {
+                eventSource.close();
+                eventSource = null;
+            }
         }
 
-        function refreshData() {
-            fetch(`/api/monitors?time_range=${timeRange}`)
+        function connectStream() {
+            if (eventSource) {
+                eventSource.close();
+            }
+            // The stream starts with a full snapshot followed by per-second updates
+            eventSource = new EventSource(`/api/stream?time_range=${timeRange}`);
+            eventSource.addEventListener('snapshot', event => {
+                setHosts(JSON.parse(event.data));
+                render();
+            });
+            eventSource.onmessage = event => {
+                applyUpdate(JSON.parse(event.data));
+            };
+            eventSource.onerror = () => {
+                document.getElementById('lastUpdate').textContent = 
+                    'Error: update stream disconnected';
+            };
+        }
+
+        function decodeRow(row) {
+            // Turn the encoded sparkline of an API row into bar heights and loss flags
+            const {sl, lm, timestamps, ...host} = row;
+            const heightBytes = atob(sl);
+            const lossMask = atob(lm);
+            host.heights = [];
+            host.losses = [];
+            for (let i = 0; i < heightBytes.length; i++) {
+                host.heights.push(heightBytes.charCodeAt(i));
+                host.losses.push((lossMask.charCodeAt(i >> 3) >> (i & 7)) & 1);
+            }
+            host.timestamps = timestamps;
+            return host;
+        }
+
+        function setHosts(data) {
+            hosts = data.map(decodeRow);
+            hostIndex = {};
+            hosts.forEach(host => {
+                hostIndex[host.name] = host;
+            });
+            dirty = true;
+        }
+
+        function lastTimestamp(host) {
+            return host.ts || 0;
+        }
+
+        function applyUpdate(rows) {
+            // Returns false if the update contained hosts not seen before
+            let known = true;
+            rows.forEach(row => {
+                const update = decodeRow(row);
+                const host = hostIndex[update.name];
+                if (!host) {
+                    update.heights = update.heights.slice(-timeRange);
+                    update.losses = update.losses.slice(-timeRange);
+                    hosts.push(update);
+                    hostIndex[update.name] = update;
+                    known = false;
+                    return;
+                }
+                // Append new measurements and drop those outside the time range
+                const since = lastTimestamp(host);
+                const newSamples = update.timestamps.filter(ts => ts > since).length;
+                const skip = update.heights.length - newSamples;
+                const heights = host.heights.concat(update.heights.slice(skip));
+                const losses = host.losses.concat(update.losses.slice(skip));
+                Object.assign(host, update);
+                host.heights = heights.slice(-timeRange);
+                host.losses = losses.slice(-timeRange);
+                host.ts = Math.max(since, update.ts || 0);
+                host.newSamples = (host.newSamples || 0) + newSamples;
+            });
+            dirty = true;
+            return known;
+        }
+
+        function render() {
+            if (!dirty) {
+                return;
+            }
+            dirty = false;
+            updateTable(hosts);
+            updateStats(hosts);
+            document.getElementById('lastUpdate').textContent = 
+                'Last updated: ' + new Date().toLocaleTimeString();
+        }
+
+        function pollUpdates() {
+            if (hosts.length === 0) {
+                refreshData();
+                return;
+            }
+            // Ask for everything newer than the oldest cursor of hosts still
+            // being updated, applyUpdate drops what each host already has
+            const cursors = hosts.filter(host => host.status !== 'stale')
+                .map(lastTimestamp).filter(ts => ts > 0);
+            const since = cursors.length > 0 ? Math.min(...cursors) : 0;
+            fetch(`/api/tick?since=${since}&time_range=${timeRange}`)
                 .then(response => response.json())
                 .then(data => {
-                    updateTable(data);
-                    updateStats(data);
+                    if (!applyUpdate(data)) {
+                        // New hosts only came with recent measurements
+                        refreshData();
+                        return;
+                    }
+                    render();
+                })
+                .catch(error => {
+                    console.error('Error fetching data:', error);
                     document.getElementById('lastUpdate').textContent = 
-                        'Last updated: ' + new Date().toLocaleTimeString();
+                        'Error: ' + error.message;
+                });
+        }
+
+        function refreshData() {
+            if (autoRefresh && window.EventSource) {
+                // Reconnecting delivers a fresh snapshot
+                connectStream();
+                return;
+            }
+            fetch(`/api/snapshot?time_range=${timeRange}`)
+                .then(response => response.json())
+                .then(data => {
+                    setHosts(data);
+                    render();
                 })
                 .catch(error => {
                     console.error('Error fetching data:', error);
@@ -564,96 +929,130 @@ HTML_TEMPLATE = '''
             
             if (!data || data.length === 0) {
                 tbody.innerHTML = '<tr><td colspan="8" class="no-data">No host data available</td></tr>';
+                tableLayout = '';
                 return;
             }
             
-            const rows = data.map(host => {
-                const lossRateClass = host.loss_rate > 10 ? 'high' : 
-                                    host.loss_rate > 1 ? 'medium' : 'low';
-                
-                return `
+            // Rebuild rows only when hosts or time range change, otherwise
+            // update cells in place so that sparklines can be drawn incrementally
+            const layout = timeRange + '\\n' + data.map(host => host.name).join('\\n');
+            if (layout !== tableLayout) {
+                // Integral bar width once the time range is filled, so shifting stays pixel exact
+                const canvasWidth = timeRange * Math.ceil(1000 / timeRange);
+                const rows = data.map(host => `
                     <tr>
                         <td>
                             <div class="host-name">${host.name}</div>
                         </td>
                         <td>
-                            <div class="host-address">${host.address}</div>
+                            <div class="host-address"></div>
                         </td>
                         <td>
-                            <span class="status-cell status-${host.status}">${host.status}</span>
-                        </td>
-                        <td class="loss-rate ${lossRateClass}">
-                            ${host.loss_rate.toFixed(1)}%
-                        </td>
-                        <td class="rtt-value">
-                            ${host.last_current > 0 ? host.last_current.toFixed(2) + 'ms' : '-'}
-                        </td>
-                        <td class="rtt-value">
-                            ${host.last_average > 0 ? host.last_average.toFixed(2) + 'ms' : '-'}
-                        </td>
-                        <td class="sequence">
-                            ${host.last_sequence}
+                            <span class="status-cell"></span>
                         </td>
+                        <td class="loss-rate"></td>
+                        <td class="rtt-value"></td>
+                        <td class="rtt-value"></td>
+                        <td class="sequence"></td>
                         <td>
                             <div class="sparkline-container">
-                                <canvas class="sparkline" width="1000" height="35" data-host="${host.name}"></canvas>
+                                <canvas class="sparkline" width="${canvasWidth}" height="35" data-host="${host.name}"></canvas>
                             </div>
                         </td>
                     </tr>
-                `;
-            });
-            
-            tbody.innerHTML = rows.join('');
+                `);
+                tbody.innerHTML = rows.join('');
+                tableLayout = layout;
+                data.forEach(host => {
+                    host.drawnLength = 0;
+                });
+            }
             
-            // Update sparklines
-            data.forEach(host => {
-                const canvas = document.querySelector(`canvas[data-host="${host.name}"]`);
-                if (canvas) {
-                    drawSparkline(canvas, host.sparkline_data);
-                }
+            data.forEach((host, i) => {
+                const cells = tbody.rows[i].cells;
+                const lossRateClass = host.loss_rate > 10 ? 'high' : 
+                                    host.loss_rate > 1 ? 'medium' : 'low';
+                
+                cells[1].firstElementChild.textContent = host.address;
+                cells[2].firstElementChild.className = `status-cell status-${host.status}`;
+                cells[2].firstElementChild.textContent = host.status;
+                cells[3].className = `loss-rate ${lossRateClass}`;
+                cells[3].textContent = `${host.loss_rate.toFixed(1)}%`;
+                cells[4].textContent = host.last_current > 0 ? host.last_current.toFixed(2) + 'ms' : '-';
+                cells[5].textContent = host.last_average > 0 ? host.last_average.toFixed(2) + 'ms' : '-';
+                cells[6].textContent = host.last_sequence;
+                updateSparkline(cells[7].querySelector('canvas'), host);
             });
         }
 
-        function drawSparkline(canvas, data) {
-            const ctx = canvas.getContext('2d');
-            const width = canvas.width;
-            const height = canvas.height;
-            
-            ctx.clearRect(0, 0, width, height);
+        function updateSparkline(canvas, host) {
+            const length = host.heights.length;
+            const newSamples = host.newSamples || 0;
+            host.newSamples = 0;
             
-            if (!data || data.length === 0) {
-                return;
+            if (host.drawnLength && newSamples === 0) {
+                return; // Nothing changed since last draw
             }
+            if (host.drawnLength === timeRange && length === timeRange && newSamples < timeRange) {
+                shiftSparkline(canvas, host, newSamples);
+            } else {
+                drawSparkline(canvas, host);
+            }
+            host.drawnLength = length;
+        }
+
+        function drawBars(ctx, host, count) {
+            // Draw the newest count bars, newest on the left, with one fill per color
+            const heights = host.heights;
+            const losses = host.losses;
+            const height = ctx.canvas.height;
+            const spacing = ctx.canvas.width / heights.length;
+            const barWidth = Math.max(1, spacing);
+            const maxValue = 100; // Fixed maximum value, server caps RTT at 100
+            const rttBars = new Path2D();
+            const lossBars = new Path2D();
             
-            // Reverse the data array so newest is on the left
-            const reversedData = [...data].reverse();
-            
-            const barWidth = Math.max(1, width / reversedData.length);
-            const maxValue = 100; // Fixed maximum value
-            const minValue = 0;   // Fixed minimum value
-            
-            // Draw bars for each data point
-            reversedData.forEach((d, i) => {
-                const x = (i / reversedData.length) * width;
-                
-                if (d.is_loss || d.current === 0) {
-                    // Loss: draw red bar at maximum height (RTT 100)
-                    ctx.fillStyle = '#dc3545';
+            for (let i = 0; i < count; i++) {
+                const j = heights.length - 1 - i;
+                const x = i * spacing;
+                if (losses[j]) {
+                    // Loss: red bar at maximum height (RTT 100)
                     const barHeight = height - 4; // Full height minus small margin
-                    ctx.fillRect(x, height - barHeight, barWidth - 1, barHeight);
+                    lossBars.rect(x, height - barHeight, barWidth - 1, barHeight);
                 } else {
-                    // Valid RTT: draw green bar proportional to RTT value
-                    ctx.fillStyle = '#28a745';
-                    const rttValue = Math.min(d.current, maxValue); // Cap at 100
-                    const barHeight = (rttValue / maxValue) * (height - 4);
-                    ctx.fillRect(x, height - barHeight, barWidth - 1, barHeight);
+                    // Valid RTT: green bar proportional to RTT value
+                    const barHeight = (heights[j] / maxValue) * (height - 4);
+                    rttBars.rect(x, height - barHeight, barWidth - 1, barHeight);
                 }
-            });
+            }
+            
+            ctx.fillStyle = '#28a745';
+            ctx.fill(rttBars);
+            ctx.fillStyle = '#dc3545';
+            ctx.fill(lossBars);
+        }
+
+        function shiftSparkline(canvas, host, newSamples) {
+            const ctx = canvas.getContext('2d');
+            const shift = newSamples * canvas.width / host.heights.length;
+            
+            // Newest is on the left: move existing bars right and draw only the new ones
+            ctx.drawImage(canvas, shift, 0);
+            ctx.clearRect(0, 0, shift, canvas.height);
+            drawBars(ctx, host, newSamples);
+        }
+
+        function drawSparkline(canvas, host) {
+            const ctx = canvas.getContext('2d');
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            drawBars(ctx, host, host.heights.length);
         }
 
         // Initialize
         document.addEventListener('DOMContentLoaded', function() {
-            refreshData();
+            if (!window.EventSource) {
+                refreshData();
+            }
             startAutoRefresh();
         });
     </script>
@@ -665,10 +1064,15 @@ HTML_TEMPLATE = '''
 @app.route('/')
 def index():
     """Main table-based monitoring dashboard page"""
-    return render_template_string(HTML_TEMPLATE, title=app_title)
+    # The title is fixed for the process lifetime, so render the template only once
+    global index_html
+    if index_html is None:
+        index_html = render_template_string(HTML_TEMPLATE, title=app_title).encode()
+    return Response(index_html, mimetype='text/html')
 
 
 @app.route('/api/monitors')
+@app.route('/api/snapshot')
 def api_monitors():
     """API endpoint to get all monitor data for table display"""
     if not log_parser:
@@ -676,96 +1080,230 @@ def api_monitors():
     
     # Get time range parameter
     time_range = int(request.args.get('time_range', 180))
+    use_gzip = request.accept_encodings['gzip'] > 0
     
-    # Update all monitors with latest data
-    config_targets = config.targets if config else {}
-    log_parser.update_all_monitors(config_targets)
-    
-    # Get all monitors and format data for table
-    monitors = log_parser.get_all_monitors()
-    monitor_list = []
-    
-    # Order monitors according to config file order
-    if config and config.target_order:
-        # Process monitors in the order they appear in config file
-        for name in config.target_order:
-            if name in monitors:
-                monitor = monitors[name]
-                sparkline_data = monitor.get_sparkline_data(time_range)
-                
-                monitor_list.append({
-                    'name': name,
-                    'address': monitor.address,
-                    'status': monitor.get_status_class(),
-                    'loss_rate': monitor.get_loss_rate(),
-                    'last_current': monitor.last_current,
-                    'last_average': monitor.last_average,
-                    'last_sequence': monitor.last_sequence,
-                    'last_update': monitor.last_update.isoformat() if monitor.last_update else None,
-                    'sparkline_data': sparkline_data
-                })
-        
-        # Add any monitors not in config (log files without config entries)
-        for name, monitor in monitors.items():
-            if name not in config.target_order:
-                sparkline_data = monitor.get_sparkline_data(time_range)
+    # Concurrent clients within the same second share one update, encoding and compression
+    with snapshot_lock:
+        now = time.monotonic()
+        cached = snapshot_cache.get(time_range)
+        if cached and now - cached[0] < SNAPSHOT_TTL:
+            created, payload, compressed = cached
+        else:
+            with log_parser.lock:
+                # Update all monitors with latest data
+                config_targets = config.targets if config else {}
+                log_parser.update_all_monitors(config_targets)
                 
-                monitor_list.append({
-                    'name': name,
-                    'address': monitor.address,
-                    'status': monitor.get_status_class(),
-                    'loss_rate': monitor.get_loss_rate(),
-                    'last_current': monitor.last_current,
-                    'last_average': monitor.last_average,
-                    'last_sequence': monitor.last_sequence,
-                    'last_update': monitor.last_update.isoformat() if monitor.last_update else None,
-                    'sparkline_data': sparkline_data
-                })
-    else:
-        # Fallback to unsorted order if no config
-        for name, monitor in monitors.items():
-            sparkline_data = monitor.get_sparkline_data(time_range)
+                # Get all monitors and format data for table
+                monitors = log_parser.get_all_monitors()
+                monitor_list = []
+                for name in _ordered_names(monitors):
+                    row = _monitor_summary(name, monitors[name])
+                    row.update(monitors[name].get_sparkline(time_range))
+                    monitor_list.append(row)
+            created, payload, compressed = now, encode_json(monitor_list), None
             
-            monitor_list.append({
-                'name': name,
-                'address': monitor.address,
-                'status': monitor.get_status_class(),
-                'loss_rate': monitor.get_loss_rate(),
-                'last_current': monitor.last_current,
-                'last_average': monitor.last_average,
-                'last_sequence': monitor.last_sequence,
-                'last_update': monitor.last_update.isoformat() if monitor.last_update else None,
-                'sparkline_data': sparkline_data
-            })
+            # Drop expired entries so arbitrary time ranges cannot accumulate
+            for key in [key for key, entry in snapshot_cache.items() if now - entry[0] >= SNAPSHOT_TTL]:
+                del snapshot_cache[key]
+        
+        if use_gzip and compressed is None and len(payload) >= GZIP_MIN_SIZE:
+            # Level 1 is several times faster than the default for a small loss in ratio
+            compressed = gzip.compress(payload, compresslevel=1)
+        snapshot_cache[time_range] = (created, payload, compressed)
     
-    return jsonify(monitor_list)
+    if use_gzip and compressed is not None:
+        response = Response(compressed, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(payload, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    return response
 
 
-@app.route('/api/monitor/<target>')
-def api_monitor_detail(target):
-    """API endpoint to get detailed data for a specific monitor"""
+@app.route('/api/tick')
+def api_tick():
+    """API endpoint to get monitor rows with only measurements newer than a client cursor"""
     if not log_parser:
         return jsonify({'error': 'Log parser not initialized'})
     
-    monitors = log_parser.get_all_monitors()
-    if target not in monitors:
-        return jsonify({'error': f'Monitor {target} not found'}), 404
+    # Epoch timestamp of the newest measurement the client already has
+    since = float(request.args.get('since', 0))
+    # Clients never draw more than their time range, however old the cursor is
+    time_range = int(request.args.get('time_range', 180))
     
-    monitor = monitors[target]
-    history = monitor.get_sparkline_data()
+    with log_parser.lock:
+        config_targets = config.targets if config else {}
+        log_parser.update_all_monitors(config_targets)
+        
+        monitors = log_parser.get_all_monitors()
+        monitor_list = []
+        for name in _ordered_names(monitors):
+            row = _monitor_summary(name, monitors[name])
+            row.update(monitors[name].get_sparkline_since(since, time_range))
+            monitor_list.append(row)
     
-    return jsonify({
-        'name': target,
+    return Response(encode_json(monitor_list), mimetype='application/json')
+
+
+def _ordered_names(monitors: Dict[str, HostMonitor]) -> List[str]:
+    """Get monitor names in display order"""
+    # Order monitors according to config file order
+    if config and config.target_order:
+        # Monitors in the order they appear in config file,
+        # then any monitors not in config (log files without config entries)
+        names = [name for name in config.target_order if name in monitors]
+        configured = set(config.target_order)
+        names.extend(name for name in monitors if name not in configured)
+        return names
+    
+    # Fallback to unsorted order if no config
+    return list(monitors)
+
+
+def _monitor_summary(name: str, monitor: HostMonitor) -> Dict:
+    """Get a monitor's table row without sparkline"""
+    return {
+        'name': name,
         'address': monitor.address,
         'status': monitor.get_status_class(),
         'loss_rate': monitor.get_loss_rate(),
         'last_current': monitor.last_current,
         'last_average': monitor.last_average,
         'last_sequence': monitor.last_sequence,
-        'last_update': monitor.last_update.isoformat() if monitor.last_update else None,
-        'history': history,
-        'history_count': len(history)
-    })
+        'last_update': monitor.last_update
+    }
+
+
+class MonitorStream:
+    """Fan-out of per-second monitor updates to Server-Sent Events subscribers"""
+    
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._subscribers = []  # One queue of pending messages per client
+        self._sent = {}  # host_name -> epoch timestamp of the last measurement pushed
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def subscribe(self, time_range: int) -> queue.Queue:
+        """Register a client, starting it off with a snapshot of all monitors"""
+        subscriber = queue.Queue(maxsize=60)
+        with self._lock, log_parser.lock:
+            # Bring every monitor up to date first, so that the snapshot ends
+            # exactly where the next broadcast picks up
+            self._broadcast()
+            
+            monitors = log_parser.get_all_monitors()
+            snapshot = []
+            for name in _ordered_names(monitors):
+                row = _monitor_summary(name, monitors[name])
+                row.update(monitors[name].get_sparkline(time_range))
+                snapshot.append(row)
+            subscriber.put(b'event: snapshot\ndata: ' + encode_json(snapshot) + b'\n\n')
+            self._subscribers.append(subscriber)
+            
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return subscriber
+    
+    def unsubscribe(self, subscriber: queue.Queue):
+        """Unregister a client"""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+    
+    def _run(self):
+        """Background loop broadcasting updates while clients are connected"""
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if self._subscribers:
+                    # Keep the loop alive, a failed sweep is retried on the next tick
+                    try:
+                        self._broadcast()
+                    except Exception as e:
+                        print(f"Error broadcasting monitor updates: {e}")
+    
+    def _broadcast(self):
+        """Update monitors once and push measurements added since the last broadcast"""
+        with log_parser.lock:
+            config_targets = config.targets if config else {}
+            log_parser.update_all_monitors(config_targets)
+            
+            monitors = log_parser.get_all_monitors()
+            rows = []
+            for name in _ordered_names(monitors):
+                monitor = monitors[name]
+                row = _monitor_summary(name, monitor)
+                row.update(monitor.get_sparkline_since(self._sent.get(name)))
+                if row['ts'] is not None:
+                    self._sent[name] = row['ts']
+                rows.append(row)
+        
+        message = b'data: ' + encode_json(rows) + b'\n\n'
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # Client is not keeping up: end its stream so that it
+                # reconnects and starts over from a fresh snapshot
+                self._subscribers.remove(subscriber)
+                try:
+                    while True:
+                        subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+                subscriber.put_nowait(None)
+
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events endpoint pushing monitor updates once per second"""
+    if not log_parser:
+        return jsonify({'error': 'Log parser not initialized'})
+    
+    # Get time range parameter for the initial snapshot
+    time_range = int(request.args.get('time_range', 180))
+    subscriber = monitor_stream.subscribe(time_range)
+    
+    def stream():
+        try:
+            while True:
+                try:
+                    message = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps idle connections open and detects closed ones
+                    yield b': keepalive\n\n'
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            monitor_stream.unsubscribe(subscriber)
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/api/monitor/<target>')
+def api_monitor_detail(target):
+    """API endpoint to get detailed data for a specific monitor"""
+    if not log_parser:
+        return jsonify({'error': 'Log parser not initialized'})
+    
+    with log_parser.lock:
+        monitors = log_parser.get_all_monitors()
+        if target not in monitors:
+            return jsonify({'error': f'Monitor {target} not found'}), 404
+        
+        monitor = monitors[target]
+        history = monitor.get_sparkline_data()
+        detail = _monitor_summary(target, monitor)
+        detail['history'] = history
+        detail['history_count'] = len(history)
+    
+    return jsonify(detail)
 
 
 @app.route('/api/stats')
@@ -774,26 +1312,26 @@ def api_stats():
     if not log_parser:
         return jsonify({'error': 'Log parser not initialized'})
     
-    monitors = log_parser.get_all_monitors()
+    # Count statuses and sum loss rates in a single pass
+    now = time.time()
+    status_counts = Counter()
+    total_loss_rate = 0.0
+    with log_parser.lock:
+        for monitor in log_parser.get_all_monitors().values():
+            status_counts[monitor.get_status_class(now)] += 1
+            total_loss_rate += monitor.get_loss_rate()
     
-    total_hosts = len(monitors)
-    up_hosts = sum(1 for m in monitors.values() if m.get_status_class() == 'up')
-    down_hosts = sum(1 for m in monitors.values() if m.get_status_class() == 'down')
-    stale_hosts = sum(1 for m in monitors.values() if m.get_status_class() == 'stale')
-    unknown_hosts = total_hosts - up_hosts - down_hosts - stale_hosts
+    total_hosts = sum(status_counts.values())
     
     # Calculate average loss rate
-    if monitors:
-        avg_loss_rate = sum(m.get_loss_rate() for m in monitors.values()) / len(monitors)
-    else:
-        avg_loss_rate = 0.0
+    avg_loss_rate = total_loss_rate / total_hosts if total_hosts else 0.0
     
     return jsonify({
         'total_hosts': total_hosts,
-        'up_hosts': up_hosts,
-        'down_hosts': down_hosts,
-        'stale_hosts': stale_hosts,
-        'unknown_hosts': unknown_hosts,
+        'up_hosts': status_counts['up'],
+        'down_hosts': status_counts['down'],
+        'stale_hosts': status_counts['stale'],
+        'unknown_hosts': status_counts['unknown'],
         'average_loss_rate': avg_loss_rate
     })
 
@@ -812,6 +1350,8 @@ def main():
                        help='Host to bind the web server to (default: 127.0.0.1)')
     parser.add_argument('--debug', action='store_true',
                        help='Run in debug mode')
+    parser.add_argument('--gunicorn', action='store_true',
+                       help='Serve with gunicorn and a gevent worker instead of the Flask development server')
     
     args = parser.parse_args()
     
@@ -820,10 +1360,22 @@ def main():
         print(f"Error: Log directory '{args.log_dir}' does not exist")
         sys.exit(1)
     
+    if args.gunicorn:
+        try:
+            import gunicorn  # noqa: F401
+            from gevent import monkey
+        except ImportError:
+            print("Error: --gunicorn requires the gunicorn and gevent packages")
+            sys.exit(1)
+        # Patch before any lock, thread or socket below is created
+        monkey.patch_all()
+    
     # Initialize global objects
-    global config, log_parser, app_title
+    global config, log_parser, monitor_stream, snapshot_lock, app_title
     
     app_title = args.name
+    monitor_stream = MonitorStream()
+    snapshot_lock = threading.Lock()
     
     if args.config:
         config = DeadmanConfig(args.config)
@@ -840,7 +1392,32 @@ def main():
         print("Warning: No log files found in the specified directory")
     
     print(f"Starting web server at http://{args.host}:{args.port}")
-    app.run(host=args.host, port=args.port, debug=args.debug)
+    if args.gunicorn:
+        run_gunicorn(args.host, args.port, debug=args.debug)
+    else:
+        app.run(host=args.host, port=args.port, debug=args.debug)
+
+
+def run_gunicorn(host: str, port: int, debug: bool = False):
+    """Serve the app with gunicorn using a single gevent worker
+    
+    A single worker keeps log_parser and the shared caches in one process,
+    while gevent serves many idle stream and polling connections.
+    """
+    from gunicorn.app.base import BaseApplication
+    
+    class DeadmanApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', 1)
+            self.cfg.set('worker_class', 'gevent')
+            self.cfg.set('worker_connections', 1000)
+            self.cfg.set('loglevel', 'debug' if debug else 'info')
+        
+        def load(self):
+            return app
+    
+    DeadmanApplication().run()
 
 
 if __name__ == '__main__':